@@ -1,16 +1,38 @@
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import orjson
 import os
 from datetime import datetime
 import uuid
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
+# O jsonify serializa com o orjson; a leitura (request.json) continua na
+# stdlib, que mantém inteiros grandes exatos. Diferença conhecida: NaN e
+# Infinity saem como null em vez de NaN/Infinity.
+class ORJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        # datetime/date passam pelo default() para manter o formato HTTP do Flask.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # Inteiros fora de 64 bits, por exemplo.
+            return super().dumps(obj, **kwargs)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Os PDFs são salvos com nomes UUID aleatórios e nunca são sobrescritos.
+UPLOAD_MAX_AGE = 31536000
 
 @app.route('/api/generate-and-upload-pdf', methods=['POST'])
 def generate_and_upload_pdf():
@@ -19,8 +41,13 @@ def generate_and_upload_pdf():
         filename = f"{uuid.uuid4().hex}.pdf"
         filepath = os.path.join(UPLOAD_FOLDER, filename)
 
+        agora = datetime.now()
         c = canvas.Canvas(filepath, pagesize=letter)
-        c.drawString(100, 750, f"Relatório de Produção - {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        c.drawString(
+            100, 750,
+            f"Relatório de Produção - {agora.day:02d}/{agora.month:02d}/{agora.year:04d} "
+            f"{agora.hour:02d}:{agora.minute:02d}"
+        )
         if isinstance(data, dict):
             for idx, (key, value) in enumerate(data.items()):
                 c.drawString(100, 730 - (idx * 20), f"{key}: {value}")
@@ -44,20 +71,32 @@ def upload_pdf():
 
         filename = f"{uuid.uuid4().hex}.pdf"
         filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        try:
+            file.save(filepath)
+        except Exception:
+            # Não deixa um PDF parcial no diretório de uploads.
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
 
         file_url = request.url_root.rstrip('/') + '/uploads/' + filename
         return jsonify({"success": True, "url": file_url}), 201
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route('/uploads/<path:filename>')
-def serve_uploaded_file(filename):
-    return send_from_directory(UPLOAD_FOLDER, filename)
+# Atrás do Nginx (deploy/nginx.conf) os uploads são servidos direto do disco;
+# defina SERVE_UPLOADS=0 para não registrar esta rota.
+if os.environ.get('SERVE_UPLOADS', '1') != '0':
+    @app.route('/uploads/<path:filename>')
+    def serve_uploaded_file(filename):
+        response = send_from_directory(UPLOAD_FOLDER, filename, max_age=UPLOAD_MAX_AGE)
+        response.cache_control.immutable = True
+        return response
 
 @app.route('/api/health')
 def health():
     return jsonify({"status": "ok"})
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port)